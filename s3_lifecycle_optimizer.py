@@ -18,6 +18,9 @@ S3 Storage Classes (approximate costs per GB/month):
 
 Environment variables:
     BUCKETS: Comma-separated list of bucket names to analyze (default: all buckets).
+    METRICS_SOURCE: Where bucket sizes come from: "cloudwatch" (default) or "storage-lens".
+    STORAGE_LENS_CONFIG_ID: S3 Storage Lens configuration with a CSV metrics export
+        (required when METRICS_SOURCE is "storage-lens").
     ENABLE_LIFECYCLE_POLICIES: If "true", create/update lifecycle policies.
     TRANSITION_TO_IA_DAYS: Days after which to transition to Standard-IA (default: 30).
     TRANSITION_TO_GLACIER_DAYS: Days after which to transition to Glacier (default: 90).
@@ -33,17 +36,51 @@ Usage:
 
 import os
 import sys
+import codecs
+import csv
 import json
+import time
 from datetime import datetime, timezone, timedelta
 from typing import Dict, List, Optional, Tuple
 import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 import requests
 
 
+# Approximate storage costs per GB/month by storage class
+PRICES_PER_GB_MONTH = {
+    'STANDARD': 0.023,
+    'STANDARD_IA': 0.0125,
+    'ONEZONE_IA': 0.01,
+    'GLACIER_IR': 0.004,
+    'GLACIER': 0.0036,
+    'DEEP_ARCHIVE': 0.00099
+}
+
+# Assumed share of bucket data in each storage class once lifecycle policies apply
+OPTIMIZED_DISTRIBUTION = {
+    'STANDARD': 0.5,
+    'STANDARD_IA': 0.3,
+    'GLACIER': 0.2
+}
+
+
+# Shared session so credentials and service models are loaded once per process
+BOTO_SESSION = boto3.session.Session()
+
+# Client configuration shared by the S3 and CloudWatch clients
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    s3={'addressing_style': 'virtual'}
+)
+
+
 def log(msg: str) -> None:
     """Prints a timestamped message to stdout."""
-    ts = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     print(f"[{ts}] {msg}")
 
 
@@ -62,13 +99,107 @@ def get_bucket_list(s3_client) -> List[str]:
         return []
 
 
+def latest_average(datapoints: List[Dict], default: float = 0.0) -> float:
+    """Get the Average of the most recent CloudWatch datapoint."""
+    return max(datapoints, key=lambda dp: dp['Timestamp'], default={'Average': default})['Average']
+
+
+def build_bucket_info(bucket_name: str, size_bytes: float, object_count: int) -> Dict:
+    """Build the bucket storage summary used for savings calculations."""
+    size_gb = size_bytes / (1024**3)
+    return {
+        'bucket_name': bucket_name,
+        'size_bytes': size_bytes,
+        'size_gb': size_gb,
+        'object_count': object_count,
+        'monthly_cost_standard': size_gb * PRICES_PER_GB_MONTH['STANDARD']
+    }
+
+
+def load_storage_lens_metrics(s3_client, config_id: str) -> Dict[str, Dict]:
+    """
+    Load per-bucket storage metrics from the latest S3 Storage Lens CSV export.
+    Returns {bucket_name: {'size_bytes': ..., 'object_count': ...}}, or {} on any
+    failure so the caller falls back to CloudWatch.
+    """
+    try:
+        log(f"Loading S3 Storage Lens metrics from configuration {config_id}")
+
+        account_id = BOTO_SESSION.client('sts', config=BOTO_CONFIG).get_caller_identity()['Account']
+        s3control_client = BOTO_SESSION.client('s3control', config=BOTO_CONFIG)
+
+        response = s3control_client.get_storage_lens_configuration(
+            ConfigId=config_id, AccountId=account_id
+        )
+        data_export = response['StorageLensConfiguration'].get('DataExport', {})
+        destination = data_export.get('S3BucketDestination')
+        if not destination:
+            log(f"Storage Lens configuration {config_id} has no S3 metrics export")
+            return {}
+
+        if destination.get('Format') != 'CSV':
+            log(f"Storage Lens export format {destination.get('Format')} is not supported, use CSV")
+            return {}
+
+        # Export layout: <prefix>/StorageLens/<account>/<config>/V_1/manifests/dt=<date>/manifest.json
+        export_bucket = destination['Arn'].split(':::')[-1]
+        prefix = destination.get('Prefix', '').strip('/')
+        manifest_prefix = '/'.join(
+            part for part in (prefix, 'StorageLens', account_id, config_id, 'V_1', 'manifests') if part
+        ) + '/'
+
+        manifest_keys = []
+        paginator = s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=export_bucket, Prefix=manifest_prefix):
+            for obj in page.get('Contents', []):
+                if obj['Key'].endswith('manifest.json'):
+                    manifest_keys.append(obj['Key'])
+
+        if not manifest_keys:
+            log(f"No Storage Lens exports found in s3://{export_bucket}/{manifest_prefix}")
+            return {}
+
+        # dt=YYYY-MM-DD partitions sort chronologically
+        manifest_key = max(manifest_keys)
+        manifest = json.loads(
+            s3_client.get_object(Bucket=export_bucket, Key=manifest_key)['Body'].read()
+        )
+        fieldnames = [field.strip() for field in manifest['reportSchema'].split(',')]
+
+        metrics = {}
+        for report_file in manifest.get('reportFiles', []):
+            body = s3_client.get_object(Bucket=export_bucket, Key=report_file['key'])['Body']
+            # Account-wide exports can be large, so decode and parse the body as a stream
+            reader = csv.DictReader(codecs.getreader('utf-8')(body), fieldnames=fieldnames)
+            for row in reader:
+                if row.get('record_type') != 'BUCKET':
+                    continue
+
+                bucket_metrics = metrics.setdefault(
+                    row['bucket_name'], {'size_bytes': 0.0, 'object_count': 0}
+                )
+                metric_name = row.get('metric_name')
+                # Only Standard storage is priced as current cost, matching the CloudWatch source
+                if metric_name == 'StorageBytes' and row.get('storage_class') == 'STANDARD':
+                    bucket_metrics['size_bytes'] += float(row['metric_value'])
+                elif metric_name == 'ObjectCount':
+                    bucket_metrics['object_count'] += int(float(row['metric_value']))
+
+        log(f"Loaded Storage Lens metrics for {len(metrics)} bucket(s) from {manifest_key}")
+        return metrics
+
+    except (BotoCoreError, ClientError, KeyError, ValueError) as e:
+        log(f"Error loading Storage Lens metrics, falling back to CloudWatch: {e}")
+        return {}
+
+
 def analyze_bucket_storage(s3_client, cloudwatch_client, bucket_name: str) -> Dict:
     """Analyze storage usage and costs for a bucket."""
     try:
         log(f"Analyzing bucket: {bucket_name}")
 
         # Get bucket size from CloudWatch metrics (more efficient than listing all objects)
-        end_time = datetime.utcnow()
+        end_time = datetime.now(timezone.utc)
         start_time = end_time - timedelta(days=2)  # Get recent metrics
 
         # Get bucket size metrics
@@ -99,25 +230,10 @@ def analyze_bucket_storage(s3_client, cloudwatch_client, bucket_name: str) -> Di
             Statistics=['Average']
         )
 
-        bucket_size_bytes = 0
-        object_count = 0
-
-        if size_response['Datapoints']:
-            bucket_size_bytes = size_response['Datapoints'][-1]['Average']
+        bucket_size_bytes = latest_average(size_response['Datapoints'])
+        object_count = int(latest_average(count_response['Datapoints']))
 
-        if count_response['Datapoints']:
-            object_count = int(count_response['Datapoints'][-1]['Average'])
-
-        bucket_size_gb = bucket_size_bytes / (1024**3)
-        monthly_cost_standard = bucket_size_gb * 0.023  # Standard storage cost
-
-        return {
-            'bucket_name': bucket_name,
-            'size_bytes': bucket_size_bytes,
-            'size_gb': bucket_size_gb,
-            'object_count': object_count,
-            'monthly_cost_standard': monthly_cost_standard
-        }
+        return build_bucket_info(bucket_name, bucket_size_bytes, object_count)
 
     except ClientError as e:
         log(f"Error analyzing bucket {bucket_name}: {e}")
@@ -296,14 +412,9 @@ def calculate_potential_savings(bucket_info: Dict, transition_to_ia_days: int,
     # In reality, savings depend on actual object age distribution
 
     # Assume 30% of objects transition to IA, 20% to Glacier
-    standard_portion = 0.5
-    ia_portion = 0.3
-    glacier_portion = 0.2
-
-    optimized_cost = (
-        (size_gb * standard_portion * 0.023) +  # Standard
-        (size_gb * ia_portion * 0.0125) +      # Standard-IA
-        (size_gb * glacier_portion * 0.0036)   # Glacier
+    optimized_cost = size_gb * sum(
+        portion * PRICES_PER_GB_MONTH[storage_class]
+        for storage_class, portion in OPTIMIZED_DISTRIBUTION.items()
     )
 
     potential_savings = current_cost - optimized_cost
@@ -377,37 +488,59 @@ def main() -> int:
     log("Starting S3 lifecycle optimization")
 
     # Configuration
+    metrics_source = os.getenv("METRICS_SOURCE", "cloudwatch").lower()
+    storage_lens_config_id = os.getenv("STORAGE_LENS_CONFIG_ID")
     enable_lifecycle_policies = os.getenv("ENABLE_LIFECYCLE_POLICIES", "false").lower() == "true"
     transition_to_ia_days = int(os.getenv("TRANSITION_TO_IA_DAYS", "30"))
     transition_to_glacier_days = int(os.getenv("TRANSITION_TO_GLACIER_DAYS", "90"))
-    enable_intelligent_tiering = os.getenv("ENABLE_INTELLIGENT_TIERING", "false").lower() == "true"
-    clean_incomplete_uploads = os.getenv("CLEAN_INCOMPLETE_UPLOADS", "false").lower() == "true"
+    intelligent_tiering_enabled = os.getenv("ENABLE_INTELLIGENT_TIERING", "false").lower() == "true"
+    incomplete_uploads_cleanup_enabled = os.getenv("CLEAN_INCOMPLETE_UPLOADS", "false").lower() == "true"
     incomplete_upload_days = int(os.getenv("INCOMPLETE_UPLOAD_DAYS", "7"))
     dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
     webhook = os.getenv("ALERT_WEBHOOK")
 
+    log(f"Metrics source: {metrics_source}")
     log(f"Enable lifecycle policies: {enable_lifecycle_policies}")
     log(f"Transition to IA after: {transition_to_ia_days} days")
     log(f"Transition to Glacier after: {transition_to_glacier_days} days")
-    log(f"Enable Intelligent-Tiering: {enable_intelligent_tiering}")
-    log(f"Clean incomplete uploads: {clean_incomplete_uploads}")
+    log(f"Enable Intelligent-Tiering: {intelligent_tiering_enabled}")
+    log(f"Clean incomplete uploads: {incomplete_uploads_cleanup_enabled}")
     log(f"Dry run mode: {dry_run}")
 
     try:
         # Create AWS clients
-        s3_client = boto3.client('s3')
-        cloudwatch_client = boto3.client('cloudwatch', region_name='us-east-1')  # S3 metrics are in us-east-1
+        s3_client = BOTO_SESSION.client('s3', config=BOTO_CONFIG)
+        cloudwatch_client = BOTO_SESSION.client(
+            'cloudwatch', region_name='us-east-1', config=BOTO_CONFIG
+        )  # S3 metrics are in us-east-1
 
         # Get bucket list
         buckets = get_bucket_list(s3_client)
         log(f"Analyzing {len(buckets)} bucket(s)")
 
+        # Storage Lens exports cover every bucket in one read; CloudWatch remains the fallback
+        lens_metrics = {}
+        if metrics_source == 'storage-lens':
+            if storage_lens_config_id:
+                lens_metrics = load_storage_lens_metrics(s3_client, storage_lens_config_id)
+            else:
+                log("STORAGE_LENS_CONFIG_ID is not set, falling back to CloudWatch metrics")
+        elif metrics_source != 'cloudwatch':
+            log(f"METRICS_SOURCE '{metrics_source}' is not supported, falling back to CloudWatch metrics")
+
         optimization_results = []
         total_potential_savings = 0
 
         for bucket_name in buckets:
             # Analyze bucket
-            bucket_info = analyze_bucket_storage(s3_client, cloudwatch_client, bucket_name)
+            if bucket_name in lens_metrics:
+                log(f"Analyzing bucket: {bucket_name}")
+                bucket_metrics = lens_metrics[bucket_name]
+                bucket_info = build_bucket_info(
+                    bucket_name, bucket_metrics['size_bytes'], bucket_metrics['object_count']
+                )
+            else:
+                bucket_info = analyze_bucket_storage(s3_client, cloudwatch_client, bucket_name)
 
             if 'error' in bucket_info:
                 log(f"Skipping {bucket_name} due to analysis error")
@@ -440,16 +573,16 @@ def main() -> int:
                 if not current_policy:
                     policy = create_lifecycle_policy(
                         transition_to_ia_days, transition_to_glacier_days,
-                        incomplete_upload_days if clean_incomplete_uploads else 0
+                        incomplete_upload_days if incomplete_uploads_cleanup_enabled else 0
                     )
                     apply_lifecycle_policy(s3_client, bucket_name, policy, dry_run)
                 else:
                     log(f"Bucket {bucket_name} already has a lifecycle policy")
 
-            if enable_intelligent_tiering:
+            if intelligent_tiering_enabled:
                 enable_intelligent_tiering(s3_client, bucket_name, dry_run)
 
-            if clean_incomplete_uploads:
+            if incomplete_uploads_cleanup_enabled:
                 cleaned_count = clean_incomplete_uploads(
                     s3_client, bucket_name, incomplete_upload_days, dry_run
                 )
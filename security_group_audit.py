@@ -3,7 +3,7 @@
 security_group_audit.py -- Audit AWS Security Groups for security and cleanup opportunities.
 
 This script analyzes AWS Security Groups across regions to identify:
-1. Unused security groups (not attached to any resources)
+1. Unused security groups (not attached to any network interface)
 2. Overly permissive rules (0.0.0.0/0 access, especially SSH/RDP)
 3. Security groups with suspicious or dangerous configurations
 4. Opportunities for rule consolidation
@@ -21,6 +21,9 @@ Environment variables:
     ALERT_ON_HIGH_RISK: If "true", send alerts for high-risk findings only.
     DRY_RUN: If "true", logs actions without making changes.
     ALERT_WEBHOOK: Optional HTTP endpoint for notifications.
+    EMIT_NDJSON: If "true", write findings as newline-delimited JSON for downstream tools.
+    OUTPUT_PATH: File to write NDJSON findings to (default: stdout, with logs moved to stderr).
+    AUDIT_CACHE_TTL: Seconds to cache describe/list API results in-process (default: 0, disabled).
 
 Usage:
     python security_group_audit.py
@@ -29,17 +32,134 @@ Usage:
 import os
 import sys
 import json
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from datetime import datetime
-from typing import Dict, List, Optional, Set, Tuple
-import boto3
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+# boto3, botocore.config and requests are imported where first used so that
+# importing this module (linting, library use) stays fast
 from botocore.exceptions import ClientError, NoCredentialsError
-import requests
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON encoder; stdlib json is used otherwise
+    orjson = None
+
+
+# Finding risk levels, most severe first
+RISK_LEVELS = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')
+
+# CIDR block that opens a rule to the whole internet
+WORLD_CIDR = '0.0.0.0/0'
+
+# Bitmap with every port 0-65535 set, for all-traffic rules
+ALL_PORTS_BITMAP = (1 << 65536) - 1
+
+# Ports that are critical when open to the internet, with their service names
+CRITICAL_PORTS = {
+    22: 'SSH',
+    3389: 'RDP',
+    1433: 'SQL Server',
+    3306: 'MySQL',
+    5432: 'PostgreSQL',
+    6379: 'Redis',
+    27017: 'MongoDB'
+}
+
+# NDJSON findings written to stdout push the human-readable log to stderr
+EMIT_NDJSON = os.getenv("EMIT_NDJSON", "false").lower() == "true"
+OUTPUT_PATH = os.getenv("OUTPUT_PATH")
+LOG_STREAM = sys.stderr if EMIT_NDJSON and not OUTPUT_PATH else sys.stdout
+
+# Upper bound on regions audited concurrently
+MAX_REGION_WORKERS = 8
+
+# In-process cache of paginated API results: {cache_key: (expires_at, items)}
+_API_CACHE: Dict[Tuple, Tuple[float, List[Dict]]] = {}
+_API_CACHE_LOCK = threading.Lock()
+
+# Per-thread boto3 sessions used to build the cached clients
+_THREAD_LOCAL = threading.local()
+
+
+@dataclass(slots=True)
+class Finding:
+    """A single security group audit finding."""
+    type: str
+    risk_level: str
+    sg_id: str
+    sg_name: str
+    region: str
+    description: str
+    from_port: Optional[int] = None
+    to_port: Optional[int] = None
+    protocol: Optional[str] = None
+    source: Optional[str] = None
+    rule_count: Optional[int] = None
 
 
 def log(msg: str) -> None:
-    """Prints a timestamped message to stdout."""
+    """Prints a timestamped message to LOG_STREAM (stderr when NDJSON goes to stdout)."""
     ts = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    print(f"[{ts}] {msg}")
+    print(f"[{ts}] {msg}", file=LOG_STREAM)
+
+
+@lru_cache(maxsize=None)
+def get_boto_config():
+    """
+    Get the client configuration shared by every regional client.
+    Adaptive retries rate-limit on the client side instead of stalling on throttled responses.
+    """
+    from botocore.config import Config
+
+    return Config(
+        max_pool_connections=50,
+        retries={'mode': 'adaptive', 'max_attempts': 10},
+        connect_timeout=5,
+        read_timeout=30
+    )
+
+
+@lru_cache(maxsize=None)
+def get_alert_session():
+    """Get the pooled HTTP session for webhook alerts, retrying transient failures."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 502, 503, 504],
+            allowed_methods=frozenset(['POST'])
+        )
+    ))
+    return session
+
+
+def get_session():
+    """Get the boto3 session for the current thread (sessions are not thread-safe)."""
+    session = getattr(_THREAD_LOCAL, 'session', None)
+    if session is None:
+        import boto3
+
+        session = _THREAD_LOCAL.session = boto3.session.Session()
+    return session
+
+
+@lru_cache(maxsize=None)
+def get_client(service: str, region: str):
+    """Get a client for a service and region, created once per process."""
+    return get_session().client(service, region_name=region, config=get_boto_config())
 
 
 def get_regions() -> List[str]:
@@ -57,8 +177,11 @@ def get_security_group_name(sg: Dict) -> str:
     if name and name != 'default':
         return name
 
-    # Check tags for a Name tag
-    tags = sg.get('Tags', [])
+    # Exact 'Name' is the AWS convention; only fall back to a case-insensitive scan
+    tags = sg.get('Tags', ())
+    for tag in tags:
+        if tag['Key'] == 'Name':
+            return tag['Value']
     for tag in tags:
         if tag['Key'].lower() == 'name':
             return tag['Value']
@@ -71,85 +194,96 @@ def is_default_security_group(sg: Dict) -> bool:
     return sg.get('GroupName') == 'default'
 
 
-def find_unused_security_groups(ec2_client, region: str) -> List[Dict]:
-    """Find security groups that are not attached to any resources."""
+def paginate_all(client, operation: str, result_key: str, **kwargs) -> List[Dict]:
+    """
+    Collect every item returned by a paginated describe/list call.
+    Results are cached in-process for AUDIT_CACHE_TTL seconds when it is set.
+    """
+    cache_ttl = float(os.getenv("AUDIT_CACHE_TTL", "0"))
+    cache_key = (
+        client.meta.region_name,
+        client.meta.service_model.service_name,
+        operation,
+        json.dumps(kwargs, sort_keys=True)
+    )
+
+    if cache_ttl > 0:
+        with _API_CACHE_LOCK:
+            cached = _API_CACHE.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+    items = []
+    paginator = client.get_paginator(operation)
+    for page in paginator.paginate(**kwargs):
+        items.extend(page[result_key])
+
+    if cache_ttl > 0:
+        with _API_CACHE_LOCK:
+            _API_CACHE[cache_key] = (time.monotonic() + cache_ttl, items)
+
+    return items
+
+
+def describe_all_security_groups(ec2_client) -> List[Dict]:
+    """Get every security group in the client's region."""
+    return paginate_all(
+        ec2_client, 'describe_security_groups', 'SecurityGroups',
+        PaginationConfig={'PageSize': 1000}
+    )
+
+
+def find_unused_security_groups(ec2_client, region: str, all_sgs: List[Dict],
+                                candidate_sgs: List[Dict]) -> List[Dict]:
+    """
+    Find security groups that are not attached to any resources.
+    References from every group in all_sgs count as usage; only candidate_sgs are reported.
+    """
     try:
         log(f"Scanning for unused security groups in {region}...")
 
-        # Get all security groups
-        sg_response = ec2_client.describe_security_groups()
-        all_sgs = sg_response['SecurityGroups']
-
-        # Get security groups in use
-        used_sg_ids = set()
-
-        # Check EC2 instances
-        try:
-            instances_response = ec2_client.describe_instances()
-            for reservation in instances_response['Reservations']:
-                for instance in reservation['Instances']:
-                    for sg in instance.get('SecurityGroups', []):
-                        used_sg_ids.add(sg['GroupId'])
-        except ClientError as e:
-            log(f"Warning: Could not check EC2 instances in {region}: {e}")
-
-        # Check ELBs (Classic Load Balancers)
-        try:
-            elb_client = boto3.client('elb', region_name=region)
-            elb_response = elb_client.describe_load_balancers()
-            for elb in elb_response['LoadBalancerDescriptions']:
-                for sg_id in elb.get('SecurityGroups', []):
-                    used_sg_ids.add(sg_id)
-        except ClientError as e:
-            log(f"Warning: Could not check classic ELBs in {region}: {e}")
-
-        # Check ALBs/NLBs
-        try:
-            elbv2_client = boto3.client('elbv2', region_name=region)
-            elbv2_response = elbv2_client.describe_load_balancers()
-            for elb in elbv2_response['LoadBalancers']:
-                for sg_id in elb.get('SecurityGroups', []):
-                    used_sg_ids.add(sg_id)
-        except ClientError as e:
-            log(f"Warning: Could not check ALBs/NLBs in {region}: {e}")
-
-        # Check RDS instances
+        # Running resources use security groups through ENIs (EC2, ELB, RDS,
+        # Lambda, ECS, EKS, VPC endpoints, EFS, ...), so one paginated call
+        # covers every service that currently has an interface
+        network_interfaces = paginate_all(
+            ec2_client, 'describe_network_interfaces', 'NetworkInterfaces',
+            PaginationConfig={'PageSize': 1000}
+        )
+        used_sg_ids = {
+            group['GroupId']
+            for eni in network_interfaces
+            for group in eni.get('Groups', ())
+        }
+
+        # Lambda reclaims the ENIs of VPC functions that sit idle, so their
+        # groups only show up in the function configuration
         try:
-            rds_client = boto3.client('rds', region_name=region)
-            rds_response = rds_client.describe_db_instances()
-            for db in rds_response['DBInstances']:
-                for sg in db.get('VpcSecurityGroups', []):
-                    used_sg_ids.add(sg['VpcSecurityGroupId'])
-        except ClientError as e:
-            log(f"Warning: Could not check RDS instances in {region}: {e}")
-
-        # Check Lambda functions
-        try:
-            lambda_client = boto3.client('lambda', region_name=region)
-            functions_response = lambda_client.list_functions()
-            for function in functions_response['Functions']:
-                vpc_config = function.get('VpcConfig', {})
-                for sg_id in vpc_config.get('SecurityGroupIds', []):
-                    used_sg_ids.add(sg_id)
+            functions = paginate_all(get_client('lambda', region), 'list_functions', 'Functions')
+            used_sg_ids.update(
+                sg_id
+                for function in functions
+                for sg_id in (function.get('VpcConfig') or {}).get('SecurityGroupIds', ())
+            )
         except ClientError as e:
             log(f"Warning: Could not check Lambda functions in {region}: {e}")
 
         # Also check if security groups reference each other
-        for sg in all_sgs:
-            for rule in sg.get('IpPermissions', []) + sg.get('IpPermissionsEgress', []):
-                for group_pair in rule.get('UserIdGroupPairs', []):
-                    referenced_sg_id = group_pair.get('GroupId')
-                    if referenced_sg_id:
-                        used_sg_ids.add(referenced_sg_id)
+        used_sg_ids.update(
+            group_pair['GroupId']
+            for sg in all_sgs
+            for rule in chain(sg.get('IpPermissions', ()), sg.get('IpPermissionsEgress', ()))
+            for group_pair in rule.get('UserIdGroupPairs', ())
+            if group_pair.get('GroupId')
+        )
 
         # Find unused security groups
         unused_sgs = []
-        for sg in all_sgs:
+        for sg in candidate_sgs:
             if sg['GroupId'] not in used_sg_ids:
                 unused_sgs.append({
                     **sg,
                     'Region': region,
-                    'Name': get_security_group_name(sg)
+                    'Name': sg['_name']
                 })
 
         log(f"Found {len(unused_sgs)} unused security group(s) in {region}")
@@ -160,82 +294,93 @@ def find_unused_security_groups(ec2_client, region: str) -> List[Dict]:
         return []
 
 
-def analyze_permissive_rules(sg: Dict, region: str) -> List[Dict]:
+def analyze_permissive_rules(sg: Dict, region: str) -> List[Finding]:
     """Analyze security group for overly permissive rules."""
     findings = []
     sg_id = sg['GroupId']
-    sg_name = get_security_group_name(sg)
-
-    # Define risky ports
-    critical_ports = {
-        22: 'SSH',
-        3389: 'RDP',
-        1433: 'SQL Server',
-        3306: 'MySQL',
-        5432: 'PostgreSQL',
-        6379: 'Redis',
-        27017: 'MongoDB'
-    }
+    sg_name = sg['_name']
 
-    # Check inbound rules
+    # Check inbound rules for internet exposure and overly broad port ranges in one pass
     for rule in sg.get('IpPermissions', []):
         from_port = rule.get('FromPort')
         to_port = rule.get('ToPort')
         protocol = rule.get('IpProtocol', 'unknown')
 
-        # Check for 0.0.0.0/0 access
-        for ip_range in rule.get('IpRanges', []):
-            cidr = ip_range.get('CidrIp')
-            if cidr == '0.0.0.0/0':
-                risk_level = 'HIGH'
-                description = f"Open to internet (0.0.0.0/0)"
-
-                if from_port in critical_ports:
-                    risk_level = 'CRITICAL'
-                    description = f"CRITICAL: {critical_ports[from_port]} open to internet"
-                elif from_port == to_port and from_port:
-                    description = f"Port {from_port} ({protocol}) open to internet"
-                elif from_port != to_port:
-                    description = f"Port range {from_port}-{to_port} ({protocol}) open to internet"
-
-                findings.append({
-                    'type': 'permissive_rule',
-                    'risk_level': risk_level,
-                    'sg_id': sg_id,
-                    'sg_name': sg_name,
-                    'region': region,
-                    'description': description,
-                    'from_port': from_port,
-                    'to_port': to_port,
-                    'protocol': protocol,
-                    'source': cidr
-                })
-
-    # Check for overly broad port ranges
-    for rule in sg.get('IpPermissions', []):
-        from_port = rule.get('FromPort', 0)
-        to_port = rule.get('ToPort', 65535)
-
-        if to_port - from_port > 1000:  # Large port range
-            findings.append({
-                'type': 'broad_port_range',
-                'risk_level': 'MEDIUM',
-                'sg_id': sg_id,
-                'sg_name': sg_name,
-                'region': region,
-                'description': f"Very broad port range: {from_port}-{to_port}",
-                'from_port': from_port,
-                'to_port': to_port
-            })
+        # Check for 0.0.0.0/0 access; descriptions are only formatted for matching rules
+        if any(ip_range.get('CidrIp') == WORLD_CIDR for ip_range in rule.get('IpRanges', ())):
+            critical_service = CRITICAL_PORTS.get(from_port)
+            risk_level = 'CRITICAL' if critical_service else 'HIGH'
+
+            if critical_service:
+                description = f"CRITICAL: {critical_service} open to internet"
+            elif from_port == to_port and from_port:
+                description = f"Port {from_port} ({protocol}) open to internet"
+            elif from_port != to_port:
+                description = f"Port range {from_port}-{to_port} ({protocol}) open to internet"
+            else:
+                description = f"Open to internet ({WORLD_CIDR})"
+
+            findings.append(Finding(
+                type='permissive_rule',
+                risk_level=risk_level,
+                sg_id=sg_id,
+                sg_name=sg_name,
+                region=region,
+                description=description,
+                from_port=from_port,
+                to_port=to_port,
+                protocol=protocol,
+                source=WORLD_CIDR
+            ))
+
+        # Check for overly broad port ranges (rules without ports cover all of them)
+        range_start = 0 if from_port is None else from_port
+        range_end = 65535 if to_port is None else to_port
+
+        if range_end - range_start > 1000:  # Large port range
+            findings.append(Finding(
+                type='broad_port_range',
+                risk_level='MEDIUM',
+                sg_id=sg_id,
+                sg_name=sg_name,
+                region=region,
+                description=f"Very broad port range: {range_start}-{range_end}",
+                from_port=range_start,
+                to_port=range_end
+            ))
 
     return findings
 
 
-def check_suspicious_configurations(sg: Dict, region: str) -> List[Dict]:
+def open_ports_bitmap(rules: List[Dict]) -> int:
+    """
+    Pack the TCP/UDP ports opened by a list of rules into a bitmap.
+    Bit N is set when port N is open, so port sets can be combined with & and |.
+    """
+    bitmap = 0
+    for rule in rules:
+        protocol = rule.get('IpProtocol')
+        if protocol == '-1':
+            # All traffic opens every port, so no narrower rule can add anything
+            return ALL_PORTS_BITMAP
+        if protocol not in ('tcp', 'udp', '6', '17'):
+            continue
+
+        from_port = rule.get('FromPort')
+        to_port = rule.get('ToPort')
+        if from_port is None or to_port is None or from_port < 0 or to_port < from_port:
+            continue
+
+        bitmap |= ((1 << (to_port - from_port + 1)) - 1) << from_port
+
+    return bitmap
+
+
+def check_suspicious_configurations(sg: Dict, region: str) -> List[Finding]:
     """Check for suspicious or unusual security group configurations."""
     findings = []
     sg_id = sg['GroupId']
-    sg_name = get_security_group_name(sg)
+    sg_name = sg['_name']
 
     inbound_rules = sg.get('IpPermissions', [])
     outbound_rules = sg.get('IpPermissionsEgress', [])
@@ -243,54 +388,46 @@ def check_suspicious_configurations(sg: Dict, region: str) -> List[Dict]:
     # Check for too many rules (complexity)
     total_rules = len(inbound_rules) + len(outbound_rules)
     if total_rules > 50:
-        findings.append({
-            'type': 'complex_sg',
-            'risk_level': 'LOW',
-            'sg_id': sg_id,
-            'sg_name': sg_name,
-            'region': region,
-            'description': f"Security group has {total_rules} rules (complexity risk)",
-            'rule_count': total_rules
-        })
+        findings.append(Finding(
+            type='complex_sg',
+            risk_level='LOW',
+            sg_id=sg_id,
+            sg_name=sg_name,
+            region=region,
+            description=f"Security group has {total_rules} rules (complexity risk)",
+            rule_count=total_rules
+        ))
 
     # Check for unusual port combinations that might indicate misconfigurations
-    open_ports = set()
-    for rule in inbound_rules:
-        from_port = rule.get('FromPort')
-        to_port = rule.get('ToPort')
-        if from_port == to_port and from_port:
-            open_ports.add(from_port)
+    open_ports = open_ports_bitmap(inbound_rules)
 
     # Check for risky combinations
-    if 22 in open_ports and 3389 in open_ports:
-        findings.append({
-            'type': 'mixed_os_access',
-            'risk_level': 'MEDIUM',
-            'sg_id': sg_id,
-            'sg_name': sg_name,
-            'region': region,
-            'description': "Both SSH (22) and RDP (3389) ports open (unusual for single OS)"
-        })
-
-    # Check for default egress rule modifications
-    default_egress = {
-        'IpProtocol': '-1',
-        'IpRanges': [{'CidrIp': '0.0.0.0/0'}]
-    }
-
-    if len(outbound_rules) != 1 or not any(
-        rule.get('IpProtocol') == '-1' and
-        any(ip_range.get('CidrIp') == '0.0.0.0/0' for ip_range in rule.get('IpRanges', []))
-        for rule in outbound_rules
-    ):
-        findings.append({
-            'type': 'modified_egress',
-            'risk_level': 'LOW',
-            'sg_id': sg_id,
-            'sg_name': sg_name,
-            'region': region,
-            'description': "Default egress rule has been modified (review needed)"
-        })
+    if open_ports >> 22 & 1 and open_ports >> 3389 & 1:
+        findings.append(Finding(
+            type='mixed_os_access',
+            risk_level='MEDIUM',
+            sg_id=sg_id,
+            sg_name=sg_name,
+            region=region,
+            description="Both SSH (22) and RDP (3389) ports open (unusual for single OS)"
+        ))
+
+    # Check for default egress rule modifications (a single all-traffic rule to 0.0.0.0/0)
+    has_default_egress = (
+        len(outbound_rules) == 1
+        and outbound_rules[0].get('IpProtocol') == '-1'
+        and any(ip_range.get('CidrIp') == WORLD_CIDR for ip_range in outbound_rules[0].get('IpRanges', ()))
+    )
+
+    if not has_default_egress:
+        findings.append(Finding(
+            type='modified_egress',
+            risk_level='LOW',
+            sg_id=sg_id,
+            sg_name=sg_name,
+            region=region,
+            description="Default egress rule has been modified (review needed)"
+        ))
 
     return findings
 
@@ -319,72 +456,173 @@ def delete_security_group(ec2_client, sg_id: str, sg_name: str, dry_run: bool) -
         return False
 
 
-def send_alert(webhook: str, audit_results: Dict) -> None:
-    """Send security group audit results to webhook."""
-    unused_count = len(audit_results.get('unused_sgs', []))
-    findings = audit_results.get('security_findings', [])
+def audit_region(region: str, check_unused: bool, check_permissive: bool,
+                 check_suspicious: bool, auto_delete_unused: bool,
+                 exclude_default: bool, dry_run: bool) -> Dict:
+    """
+    Audit the security groups of a single region.
+    Returns a partial audit result for the region.
+    """
+    log(f"Auditing security groups in region {region}")
 
-    if not unused_count and not findings:
-        return
+    ec2_client = get_client('ec2', region)
 
-    # Count findings by risk level
-    risk_counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
-    for finding in findings:
-        risk_level = finding.get('risk_level', 'LOW')
-        risk_counts[risk_level] += 1
+    region_results = {
+        'unused_sgs': [],
+        'security_findings': [],
+        'deleted_sgs': 0
+    }
 
-    message_lines = [
-        f"AWS Security Group Audit Report",
-        f""
-    ]
+    # Security groups are fetched once and shared by every check
+    try:
+        all_sgs = describe_all_security_groups(ec2_client)
+    except ClientError as e:
+        log(f"Error listing security groups in {region}: {e}")
+        return region_results
+
+    # Resolve names and default status once; later checks and reports read the fields
+    for sg in all_sgs:
+        sg['_name'] = get_security_group_name(sg)
+        sg['_is_default'] = is_default_security_group(sg)
+
+    # Drop default groups once, up front, so no later pass iterates over them.
+    # DescribeSecurityGroups has no negative filter, so this happens client-side.
+    if exclude_default:
+        audited_sgs = [sg for sg in all_sgs if not sg['_is_default']]
+    else:
+        audited_sgs = all_sgs
+
+    # Find unused security groups
+    if check_unused:
+        unused_sgs = find_unused_security_groups(ec2_client, region, all_sgs, audited_sgs)
+
+        region_results['unused_sgs'].extend(unused_sgs)
+
+        # Delete unused security groups if enabled
+        if auto_delete_unused and unused_sgs:
+            log(f"Auto-deleting {len(unused_sgs)} unused security groups in {region}...")
+            for sg in unused_sgs:
+                if delete_security_group(ec2_client, sg['GroupId'], sg['Name'], dry_run):
+                    region_results['deleted_sgs'] += 1
+
+    # Check for security issues
+    if check_permissive or check_suspicious:
+        # Each check runs as one batch pass over the region's security groups
+        if check_permissive:
+            region_results['security_findings'].extend(chain.from_iterable(
+                analyze_permissive_rules(sg, region) for sg in audited_sgs
+            ))
+
+        if check_suspicious:
+            region_results['security_findings'].extend(chain.from_iterable(
+                check_suspicious_configurations(sg, region) for sg in audited_sgs
+            ))
+
+    return region_results
+
+
+def iter_alert_lines(audit_results: Dict, risk_counts: Counter) -> Iterator[str]:
+    """Yield the lines of the webhook alert message."""
+    unused_sgs = audit_results.get('unused_sgs', [])
+    findings = audit_results.get('security_findings', [])
 
-    if unused_count > 0:
-        message_lines.append(f"Unused security groups: {unused_count}")
+    yield "AWS Security Group Audit Report"
+    yield ""
+
+    if unused_sgs:
+        yield f"Unused security groups: {len(unused_sgs)}"
 
     if findings:
-        message_lines.extend([
-            f"Security findings:",
-            f"  Critical: {risk_counts['CRITICAL']}",
-            f"  High: {risk_counts['HIGH']}",
-            f"  Medium: {risk_counts['MEDIUM']}",
-            f"  Low: {risk_counts['LOW']}"
-        ])
+        yield "Security findings:"
+        yield f"  Critical: {risk_counts['CRITICAL']}"
+        yield f"  High: {risk_counts['HIGH']}"
+        yield f"  Medium: {risk_counts['MEDIUM']}"
+        yield f"  Low: {risk_counts['LOW']}"
 
-    message_lines.append("")
+    yield ""
 
     # Show critical and high-risk findings
-    critical_findings = [f for f in findings if f.get('risk_level') in ['CRITICAL', 'HIGH']]
-    if critical_findings:
-        message_lines.append("High-Priority Issues:")
-        for finding in critical_findings[:10]:  # Limit to top 10
-            message_lines.append(
-                f"- {finding['sg_name']} ({finding['sg_id']}) in {finding['region']}: "
-                f"{finding['description']}"
+    critical_count = risk_counts['CRITICAL'] + risk_counts['HIGH']
+    if critical_count:
+        yield "High-Priority Issues:"
+        critical_findings = (f for f in findings if f.risk_level in ('CRITICAL', 'HIGH'))
+        for finding in islice(critical_findings, 10):  # Limit to top 10
+            yield (
+                f"- {finding.sg_name} ({finding.sg_id}) in {finding.region}: "
+                f"{finding.description}"
             )
-        if len(critical_findings) > 10:
-            message_lines.append(f"... and {len(critical_findings) - 10} more critical/high-risk issues")
+        if critical_count > 10:
+            yield f"... and {critical_count - 10} more critical/high-risk issues"
 
     # Show sample unused security groups
-    if unused_count > 0:
-        message_lines.append("")
-        message_lines.append("Sample Unused Security Groups:")
-        unused_sgs = audit_results.get('unused_sgs', [])
-        for sg in unused_sgs[:5]:  # Show first 5
-            message_lines.append(f"- {sg['Name']} ({sg['GroupId']}) in {sg['Region']}")
+    if unused_sgs:
+        yield ""
+        yield "Sample Unused Security Groups:"
+        for sg in islice(unused_sgs, 5):  # Show first 5
+            yield f"- {sg['Name']} ({sg['GroupId']}) in {sg['Region']}"
         if len(unused_sgs) > 5:
-            message_lines.append(f"... and {len(unused_sgs) - 5} more unused security groups")
+            yield f"... and {len(unused_sgs) - 5} more unused security groups"
+
+    yield ""
+    yield "Regular security group audits help maintain security posture"
+    yield "Review and clean up unused security groups"
+    yield "Avoid overly permissive rules (0.0.0.0/0 access)"
+
+
+def dumps_json(payload: Dict) -> bytes:
+    """Serialize a payload to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def write_ndjson(audit_results: Dict, output_path: Optional[str]) -> None:
+    """Write unused security groups and findings as newline-delimited JSON."""
+    records = chain(
+        (
+            Finding(
+                type='unused_sg',
+                risk_level='LOW',
+                sg_id=sg['GroupId'],
+                sg_name=sg['Name'],
+                region=sg['Region'],
+                description="Security group is not attached to any network interface"
+            )
+            for sg in audit_results['unused_sgs']
+        ),
+        audit_results['security_findings']
+    )
+    ndjson = b"".join(dumps_json(asdict(record)) + b"\n" for record in records)
 
-    message_lines.extend([
-        f"",
-        f"Regular security group audits help maintain security posture",
-        f"Review and clean up unused security groups",
-        f"Avoid overly permissive rules (0.0.0.0/0 access)"
-    ])
+    if output_path:
+        with open(output_path, 'wb') as output_file:
+            output_file.write(ndjson)
+        log(f"Wrote NDJSON findings to {output_path}")
+    else:
+        sys.stdout.buffer.write(ndjson)
+        sys.stdout.flush()
 
-    payload = {"text": "\n".join(message_lines)}
+
+def send_alert(webhook: str, audit_results: Dict) -> None:
+    """Send security group audit results to webhook."""
+    unused_count = len(audit_results.get('unused_sgs', []))
+    findings = audit_results.get('security_findings', [])
+
+    if not unused_count and not findings:
+        return
+
+    # Count findings by risk level
+    risk_counts = Counter(finding.risk_level for finding in findings)
+
+    payload = {"text": "\n".join(iter_alert_lines(audit_results, risk_counts))}
 
     try:
-        response = requests.post(webhook, json=payload, timeout=10)
+        response = get_alert_session().post(
+            webhook,
+            data=dumps_json(payload),
+            headers={'Content-Type': 'application/json'},
+            timeout=10
+        )
         if response.status_code == 200:
             log(f"Alert sent successfully to webhook")
         else:
@@ -426,46 +664,23 @@ def main() -> int:
     }
 
     try:
-        for region in regions:
-            log(f"Auditing security groups in region {region}")
-            ec2_client = boto3.client('ec2', region_name=region)
-
-            # Find unused security groups
-            if check_unused:
-                unused_sgs = find_unused_security_groups(ec2_client, region)
-
-                if exclude_default:
-                    unused_sgs = [sg for sg in unused_sgs if not is_default_security_group(sg)]
-
-                audit_results['unused_sgs'].extend(unused_sgs)
-
-                # Delete unused security groups if enabled
-                if auto_delete_unused and unused_sgs:
-                    log(f"Auto-deleting {len(unused_sgs)} unused security groups in {region}...")
-                    for sg in unused_sgs:
-                        if delete_security_group(ec2_client, sg['GroupId'], sg['Name'], dry_run):
-                            audit_results['deleted_sgs'] += 1
-
-            # Check for security issues
-            if check_permissive or check_suspicious:
-                try:
-                    sg_response = ec2_client.describe_security_groups()
-                    all_sgs = sg_response['SecurityGroups']
-
-                    if exclude_default:
-                        all_sgs = [sg for sg in all_sgs if not is_default_security_group(sg)]
-
-                    for sg in all_sgs:
-                        if check_permissive:
-                            findings = analyze_permissive_rules(sg, region)
-                            audit_results['security_findings'].extend(findings)
+        # Regions are independent, so overlap their API latency
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_REGION_WORKERS, len(regions)))) as executor:
+            region_results = executor.map(
+                lambda region: audit_region(
+                    region, check_unused, check_permissive, check_suspicious,
+                    auto_delete_unused, exclude_default, dry_run
+                ),
+                regions
+            )
 
-                        if check_suspicious:
-                            findings = check_suspicious_configurations(sg, region)
-                            audit_results['security_findings'].extend(findings)
+            for region_result in region_results:
+                audit_results['unused_sgs'].extend(region_result['unused_sgs'])
+                audit_results['security_findings'].extend(region_result['security_findings'])
+                audit_results['deleted_sgs'] += region_result['deleted_sgs']
 
-                except ClientError as e:
-                    log(f"Error checking security configurations in {region}: {e}")
+        if EMIT_NDJSON:
+            write_ndjson(audit_results, OUTPUT_PATH)
 
         # Summary
         log(f"")
@@ -479,23 +694,19 @@ def main() -> int:
 
         # Break down findings by risk level
         findings = audit_results['security_findings']
+        risk_counts = Counter(finding.risk_level for finding in findings)
         if findings:
-            risk_counts = {'CRITICAL': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
-            for finding in findings:
-                risk_level = finding.get('risk_level', 'LOW')
-                risk_counts[risk_level] += 1
-
             log("Security findings by risk level:")
-            for risk, count in risk_counts.items():
-                if count > 0:
-                    log(f"  {risk}: {count}")
+            for risk in RISK_LEVELS:
+                if risk_counts[risk] > 0:
+                    log(f"  {risk}: {risk_counts[risk]}")
 
         # Send alerts
         should_alert = False
         if alert_on_high_risk:
             # Only alert on high-risk findings
-            high_risk_findings = [f for f in findings if f.get('risk_level') in ['CRITICAL', 'HIGH']]
-            should_alert = len(high_risk_findings) > 0 or len(audit_results['unused_sgs']) > 0
+            high_risk_count = risk_counts['CRITICAL'] + risk_counts['HIGH']
+            should_alert = high_risk_count > 0 or len(audit_results['unused_sgs']) > 0
         else:
             # Alert on any findings
             should_alert = len(findings) > 0 or len(audit_results['unused_sgs']) > 0
@@ -0,0 +1,23 @@
+"""Tests for unused_ebs_detector.should_exclude_volume."""
+
+from unused_ebs_detector import should_exclude_volume
+
+
+def test_matching_tag_key_excludes_volume():
+    tags = [{'Key': 'Name', 'Value': 'data'}, {'Key': 'DoNotDelete', 'Value': 'true'}]
+    assert should_exclude_volume(tags, frozenset({'DoNotDelete', 'Production'}))
+
+
+def test_non_matching_tag_key_keeps_volume():
+    tags = [{'Key': 'Name', 'Value': 'data'}]
+    assert not should_exclude_volume(tags, frozenset({'DoNotDelete'}))
+
+
+def test_empty_exclude_set_keeps_volume():
+    tags = [{'Key': 'DoNotDelete', 'Value': 'true'}]
+    assert not should_exclude_volume(tags, frozenset())
+
+
+def test_volume_without_tags_is_not_excluded():
+    # iter_unused_volumes passes () when a volume has no Tags key
+    assert not should_exclude_volume((), frozenset({'DoNotDelete'}))
@@ -0,0 +1,22 @@
+"""Tests for unused_eip_cleanup.should_exclude_eip."""
+
+from unused_eip_cleanup import should_exclude_eip
+
+
+def test_matching_tag_key_excludes_eip():
+    eip = {'PublicIp': '203.0.113.10', 'Tags': [{'Key': 'Production', 'Value': 'yes'}]}
+    assert should_exclude_eip(eip, frozenset({'DoNotDelete', 'Production'}))
+
+
+def test_non_matching_tag_key_keeps_eip():
+    eip = {'PublicIp': '203.0.113.10', 'Tags': [{'Key': 'Name', 'Value': 'web'}]}
+    assert not should_exclude_eip(eip, frozenset({'DoNotDelete'}))
+
+
+def test_empty_exclude_set_keeps_eip():
+    eip = {'PublicIp': '203.0.113.10', 'Tags': [{'Key': 'DoNotDelete', 'Value': 'true'}]}
+    assert not should_exclude_eip(eip, frozenset())
+
+
+def test_eip_without_tags_is_not_excluded():
+    assert not should_exclude_eip({'PublicIp': '203.0.113.10'}, frozenset({'DoNotDelete'}))
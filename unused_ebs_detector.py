@@ -15,7 +15,8 @@ EBS Volume Pricing (approximate):
 - sc1: $0.025 per GB per month
 
 Environment variables:
-    REGIONS: Comma-separated list of AWS regions to scan.
+    REGIONS: Comma-separated list of AWS regions to scan, or "all" for every region
+        enabled for the account.
     MIN_UNUSED_HOURS: Minimum hours a volume must be unattached (default: 24).
     EXCLUDE_TAGS: Comma-separated list of tag keys. Volumes with these tags are preserved.
     CREATE_SNAPSHOTS: If "true", create snapshots before suggesting deletion.
@@ -31,164 +32,236 @@ Usage:
 import os
 import sys
 import json
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple
+from itertools import chain
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
 import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON encoder; stdlib json is used otherwise
+    orjson = None
+
+
+# Approximate monthly cost per volume type as ($ per GB, $ per provisioned IOPS).
+# Only io1/io2 bill for IOPS (about $0.065 per IOPS); gp3's baseline IOPS are free.
+VOLUME_COSTS = {
+    'gp3': (0.08, 0.0),
+    'gp2': (0.10, 0.0),
+    'io1': (0.125, 0.065),
+    'io2': (0.125, 0.065),
+    'st1': (0.045, 0.0),
+    'sc1': (0.025, 0.0),
+    'standard': (0.05, 0.0)  # Legacy magnetic volumes
+}
+
+# Cost used for volume types missing from VOLUME_COSTS
+DEFAULT_VOLUME_COST = (0.10, 0.0)
+
+# DescribeVolumes page size; 500 is the API's MaxResults cap, so paging needs the fewest round-trips
+VOLUME_PAGE_SIZE = 500
+
+# Log output stream; writes are buffered and flushed at summary boundaries
+_OUT = sys.stdout
+
+# Tag keys that exempt a resource from cleanup, parsed once at startup
+EXCLUDE_TAGS = frozenset(tag.strip() for tag in os.getenv("EXCLUDE_TAGS", "").split(",") if tag.strip())
+
+# Upper bound on regions scanned concurrently
+MAX_REGION_WORKERS = 32
+
+# Upper bound on concurrent snapshot/delete calls within a region
+MAX_ACTION_WORKERS = 16
+
+# Keep-alive session for webhook alerts; retries transient gateway/throttling errors
+_HTTP = requests.Session()
+_HTTP.headers.update({'Content-Type': 'application/json'})
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset(['POST'])
+    )
+)
+_HTTP.mount('https://', _HTTP_ADAPTER)
+_HTTP.mount('http://', _HTTP_ADAPTER)
+
+
+@dataclass(slots=True)
+class UnusedVolume:
+    """An unattached EBS volume and its estimated monthly cost."""
+    volume_id: str
+    name: str
+    size: int
+    volume_type: str
+    state: str
+    create_time: Optional[datetime]
+    region: str
+    monthly_cost: float
+    tags: Sequence[Dict]
+    iops: int
+    availability_zone: str
 
 
 def log(msg: str) -> None:
-    """Prints a timestamped message to stdout."""
-    ts = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    print(f"[{ts}] {msg}")
+    """Writes a timestamped message to stdout (flushed at summary and exit)."""
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    _OUT.write(f"[{ts}] {msg}\n")  # single write keeps lines whole across threads
 
 
-def get_regions() -> List[str]:
+def discover_enabled_regions(session, boto_config) -> List[str]:
+    """
+    Get the regions enabled for the account, skipping opt-in regions that were
+    never turned on (they would only return empty responses).
+    """
+    client = session.client(
+        'ec2', region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"), config=boto_config
+    )
+    response = client.describe_regions(
+        Filters=[{'Name': 'opt-in-status', 'Values': ['opt-in-not-required', 'opted-in']}]
+    )
+    return sorted(region['RegionName'] for region in response['Regions'])
+
+
+def get_regions(session, boto_config) -> List[str]:
     """Get list of regions to scan."""
-    regions_env = os.getenv("REGIONS")
+    default = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+    regions_env = os.getenv("REGIONS", "").strip()
+
+    if regions_env.lower() == "all":
+        try:
+            return discover_enabled_regions(session, boto_config)
+        except (BotoCoreError, ClientError) as e:
+            log(f"Could not discover enabled regions, falling back to {default}: {e}")
+            return [default]
+
     if regions_env:
         return [r.strip() for r in regions_env.split(",") if r.strip()]
-    default = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
     return [default]
 
 
-def get_volume_name(volume: Dict) -> str:
-    """Get a friendly name for the volume from tags."""
-    tags = volume.get('Tags', [])
+def get_volume_name(tags: Sequence[Dict], volume_id: str) -> str:
+    """Get a friendly name for the volume from its tags."""
+    # Exact 'Name' is the AWS convention; only fall back to a case-insensitive scan
+    for tag in tags:
+        if tag['Key'] == 'Name':
+            return tag['Value']
     for tag in tags:
         if tag['Key'].lower() == 'name':
             return tag['Value']
-    return f"vol-{volume['VolumeId'][-8:]}"
+    return f"vol-{volume_id[-8:]}"
 
 
-def should_exclude_volume(volume: Dict, exclude_tags: List[str]) -> bool:
-    """Check if volume should be excluded based on tags."""
+def should_exclude_volume(tags: Sequence[Dict], exclude_tags: FrozenSet[str]) -> bool:
+    """Check if volume should be excluded based on its tags."""
     if not exclude_tags:
         return False
 
-    volume_tags = volume.get('Tags', [])
-    volume_tag_keys = [tag['Key'] for tag in volume_tags]
-
-    for exclude_tag in exclude_tags:
-        if exclude_tag in exclude_tag_keys:
-            return True
-
-    return False
+    return not exclude_tags.isdisjoint(tag['Key'] for tag in tags)
 
 
 def calculate_monthly_cost(volume: Dict) -> float:
-    """Calculate monthly cost for a volume based on its type and size."""
-    volume_type = volume['VolumeType']
-    size_gb = volume['Size']
-    iops = volume.get('Iops', 0)
-
-    # Base storage costs per GB per month (approximate)
-    storage_costs = {
-        'gp3': 0.08,
-        'gp2': 0.10,
-        'io1': 0.125,
-        'io2': 0.125,
-        'st1': 0.045,
-        'sc1': 0.025,
-        'standard': 0.05  # Legacy magnetic volumes
-    }
-
-    base_cost = size_gb * storage_costs.get(volume_type, 0.10)
-
-    # Add IOPS costs for provisioned IOPS volumes
-    if volume_type in ['io1', 'io2'] and iops > 0:
-        # io1/io2 IOPS cost approximately $0.065 per IOPS per month
-        iops_cost = iops * 0.065
-        base_cost += iops_cost
-
-    return base_cost
+    """Calculate monthly cost for a volume based on its type, size and IOPS."""
+    storage_cost, iops_cost = VOLUME_COSTS.get(volume['VolumeType'], DEFAULT_VOLUME_COST)
+    return volume['Size'] * storage_cost + (volume.get('Iops') or 0) * iops_cost
 
 
 def get_volume_attachment_time(volume: Dict) -> Optional[datetime]:
     """Get the last time the volume was detached (approximate)."""
     # This is a simplified approach. In reality, you'd need CloudTrail for exact detachment time.
     # We'll use the volume creation time as a fallback
+    # boto3 already returns tz-aware UTC datetimes; only naive values need a zone attached
     create_time = volume.get('CreateTime')
-    if create_time:
-        return create_time.replace(tzinfo=timezone.utc)
-    return None
+    if create_time is None or create_time.tzinfo is not None:
+        return create_time
+    return create_time.replace(tzinfo=timezone.utc)
 
 
-def analyze_unused_volumes(client, region: str, exclude_tags: List[str],
-                          min_unused_hours: int) -> Tuple[List[Dict], float]:
+def iter_unused_volumes(client, region: str, exclude_tags: FrozenSet[str],
+                        min_unused_hours: int) -> Iterator[UnusedVolume]:
     """
-    Find unused (unattached) EBS volumes in a region.
-    Returns (unused_volumes, total_monthly_cost).
+    Yield unused (unattached) EBS volumes in a region as each page is read,
+    so callers can act on them while later pages are still being fetched.
     """
     try:
         log(f"Scanning EBS volumes in region {region}...")
 
-        # Get all volumes
+        # Only available (unattached) volumes; filtering server-side skips in-use volumes entirely
         paginator = client.get_paginator('describe_volumes')
-        unused_volumes = []
 
-        for page in paginator.paginate():
+        # Loop invariants for the minimum unused time check
+        now = datetime.now(timezone.utc)
+        min_unused_delta = timedelta(hours=min_unused_hours)
+
+        pages = paginator.paginate(
+            Filters=[{'Name': 'status', 'Values': ['available']}],
+            PaginationConfig={'PageSize': VOLUME_PAGE_SIZE}
+        )
+
+        for page in pages:
             for volume in page['Volumes']:
                 volume_id = volume['VolumeId']
-                name = get_volume_name(volume)
+                tags = volume.get('Tags') or ()
+                name = get_volume_name(tags, volume_id)
                 state = volume['State']
                 size_gb = volume['Size']
                 volume_type = volume['VolumeType']
 
-                # Only consider available (unattached) volumes
-                if state != 'available':
-                    log(f"  {volume_id} ({name}): {state} - {size_gb} GB {volume_type}")
-                    continue
-
                 # Check if should be excluded by tags
-                if should_exclude_volume(volume, exclude_tags):
+                if should_exclude_volume(tags, exclude_tags):
                     log(f"  {volume_id} ({name}): Unused but excluded by tag")
                     continue
 
                 # Check minimum unused time (simplified - would need CloudTrail for precision)
                 attachment_time = get_volume_attachment_time(volume)
                 if attachment_time:
-                    hours_unused = (datetime.now(timezone.utc) - attachment_time).total_seconds() / 3600
-                    if hours_unused < min_unused_hours:
+                    unused_delta = now - attachment_time
+                    if unused_delta < min_unused_delta:
+                        hours_unused = unused_delta.total_seconds() / 3600
                         log(f"  {volume_id} ({name}): Unused for only {hours_unused:.1f} hours, keeping")
                         continue
 
                 monthly_cost = calculate_monthly_cost(volume)
 
-                unused_volumes.append({
-                    'VolumeId': volume_id,
-                    'Name': name,
-                    'Size': size_gb,
-                    'VolumeType': volume_type,
-                    'State': state,
-                    'CreateTime': volume.get('CreateTime'),
-                    'Region': region,
-                    'MonthlyCost': monthly_cost,
-                    'Tags': volume.get('Tags', []),
-                    'Iops': volume.get('Iops', 0),
-                    'AvailabilityZone': volume['AvailabilityZone']
-                })
-
                 log(f"  {volume_id} ({name}): UNUSED - {size_gb} GB {volume_type}, ${monthly_cost:.2f}/month")
 
-        total_monthly_cost = sum(vol['MonthlyCost'] for vol in unused_volumes)
-        log(f"Found {len(unused_volumes)} unused volume(s) in {region}, total cost: ${total_monthly_cost:.2f}/month")
-
-        return unused_volumes, total_monthly_cost
+                yield UnusedVolume(
+                    volume_id=volume_id,
+                    name=name,
+                    size=size_gb,
+                    volume_type=volume_type,
+                    state=state,
+                    create_time=volume.get('CreateTime'),
+                    region=region,
+                    monthly_cost=monthly_cost,
+                    tags=tags,
+                    iops=volume.get('Iops', 0),
+                    availability_zone=volume['AvailabilityZone']
+                )
 
     except ClientError as e:
         log(f"Error analyzing volumes in {region}: {e}")
-        return [], 0.0
 
 
-def create_snapshot_for_volume(client, volume_info: Dict, dry_run: bool) -> Optional[str]:
+def create_snapshot_for_volume(client, volume_info: UnusedVolume, dry_run: bool) -> Optional[str]:
     """
     Create a snapshot for a volume before deletion.
     Returns snapshot ID if successful.
     """
-    volume_id = volume_info['VolumeId']
-    name = volume_info['Name']
+    volume_id = volume_info.volume_id
+    name = volume_info.name
 
     try:
         if dry_run:
@@ -224,14 +297,14 @@ def create_snapshot_for_volume(client, volume_info: Dict, dry_run: bool) -> Opti
         return None
 
 
-def delete_volume(client, volume_info: Dict, dry_run: bool) -> bool:
+def delete_volume(client, volume_info: UnusedVolume, dry_run: bool) -> bool:
     """
     Delete an unused EBS volume.
     Returns True if successful.
     """
-    volume_id = volume_info['VolumeId']
-    name = volume_info['Name']
-    monthly_cost = volume_info['MonthlyCost']
+    volume_id = volume_info.volume_id
+    name = volume_info.name
+    monthly_cost = volume_info.monthly_cost
 
     try:
         if dry_run:
@@ -254,61 +327,125 @@ def delete_volume(client, volume_info: Dict, dry_run: bool) -> bool:
             return False
 
 
-def send_alert(webhook: str, unused_volumes: List[Dict], total_cost: float,
+def apply_volume_actions(client, volume: UnusedVolume, create_snapshots: bool,
+                         auto_delete: bool, dry_run: bool) -> Tuple[bool, bool]:
+    """
+    Snapshot and/or delete a single volume. The delete only runs once the
+    volume's own snapshot call has returned successfully.
+    Returns (snapshot_created, volume_deleted).
+    """
+    snapshot_created = False
+    if create_snapshots:
+        snapshot_created = create_snapshot_for_volume(client, volume, dry_run) is not None
+        if not snapshot_created:
+            if auto_delete:
+                log(f"Skipping deletion of volume {volume.volume_id}: no backup snapshot")
+            return False, False
+
+    volume_deleted = auto_delete and delete_volume(client, volume, dry_run)
+    return snapshot_created, volume_deleted
+
+
+def process_region(ec2_client, region: str, exclude_tags: FrozenSet[str], min_unused_hours: int,
+                   create_snapshots: bool, auto_delete: bool,
+                   dry_run: bool) -> Tuple[List[UnusedVolume], float, Dict]:
+    """
+    Find unused volumes in a region and apply the configured actions.
+    Returns (unused_volumes, monthly_cost, action_summary) for the region.
+    """
+    action_summary = {'snapshots_created': 0, 'volumes_deleted': 0, 'deleted_cost': 0.0}
+    unused_volumes = []
+    monthly_cost = 0.0
+    action_futures = []
+
+    # Snapshot/delete calls are submitted as volumes stream in, so they overlap with paging
+    with ThreadPoolExecutor(max_workers=MAX_ACTION_WORKERS) as executor:
+        for volume in iter_unused_volumes(ec2_client, region, exclude_tags, min_unused_hours):
+            unused_volumes.append(volume)
+            monthly_cost += volume.monthly_cost
+
+            if create_snapshots or auto_delete:
+                action_futures.append((volume, executor.submit(
+                    apply_volume_actions, ec2_client, volume, create_snapshots, auto_delete, dry_run
+                )))
+
+        log(f"Found {len(unused_volumes)} unused volume(s) in {region}, total cost: ${monthly_cost:.2f}/month")
+
+        for volume, future in action_futures:
+            snapshot_created, volume_deleted = future.result()
+            action_summary['snapshots_created'] += snapshot_created
+            if volume_deleted:
+                action_summary['volumes_deleted'] += 1
+                action_summary['deleted_cost'] += volume.monthly_cost
+
+    if create_snapshots and unused_volumes:
+        log(f"Created {action_summary['snapshots_created']} snapshot(s) in {region}")
+    if auto_delete and unused_volumes:
+        log(f"Deleted {action_summary['volumes_deleted']} unused volume(s) in {region}")
+
+    return unused_volumes, monthly_cost, action_summary
+
+
+def dumps_json(payload: Dict) -> bytes:
+    """Serialize a payload to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def send_alert(webhook: str, unused_volumes: List[UnusedVolume], total_cost: float,
                action_summary: Dict, dry_run: bool) -> None:
     """Send alert about unused volumes to webhook."""
     if not unused_volumes:
         return
 
-    total_size = sum(vol['Size'] for vol in unused_volumes)
+    total_size = sum(vol.size for vol in unused_volumes)
     snapshots_created = action_summary.get('snapshots_created', 0)
     volumes_deleted = action_summary.get('volumes_deleted', 0)
 
-    message_lines = [
-        f"AWS Unused EBS Volume Report",
-        f"",
+    header_lines = [
+        "AWS Unused EBS Volume Report",
+        "",
         f"Found {len(unused_volumes)} unused volume(s)",
         f"Total monthly cost: ${total_cost:.2f}",
         f"Total size: {total_size:,} GB",
     ]
 
     if snapshots_created > 0:
-        message_lines.append(f"Snapshots created: {snapshots_created}")
+        header_lines.append(f"Snapshots created: {snapshots_created}")
 
     if volumes_deleted > 0:
         action = "Would delete" if dry_run else "Deleted"
-        savings = sum(vol['MonthlyCost'] for vol in unused_volumes[:volumes_deleted])
-        message_lines.extend([
+        savings = action_summary.get('deleted_cost', 0.0)
+        header_lines += [
             f"{action} {volumes_deleted} volume(s)",
             f"Monthly savings: ${savings:.2f}"
-        ])
-
-    message_lines.append("")
-    message_lines.append("Volume Details:")
-
-    for vol in unused_volumes[:8]:  # Show first 8 volumes
-        az = vol.get('AvailabilityZone', 'Unknown')
-        status = "Deleted" if volumes_deleted > 0 and not dry_run else "Unused"
-        message_lines.append(
-            f"- {vol['VolumeId']} ({vol['Name']}) - "
-            f"{vol['Size']} GB {vol['VolumeType']} in {az} - "
-            f"${vol['MonthlyCost']:.2f}/month - {status}"
-        )
+        ]
 
-    if len(unused_volumes) > 8:
-        message_lines.append(f"... and {len(unused_volumes) - 8} more")
+    header_lines += ["", "Volume Details:"]
 
-    message_lines.extend([
-        f"",
-        f"Unused EBS volumes continue to incur storage costs",
-        f"Consider creating snapshots before deletion for backup",
-        f"Regular cleanup helps control storage expenses"
-    ])
+    # Only the first 8 volumes are formatted, the rest are summarized in one line
+    status = "Deleted" if volumes_deleted > 0 and not dry_run else "Unused"
+    volume_lines = [
+        f"- {vol.volume_id} ({vol.name}) - "
+        f"{vol.size} GB {vol.volume_type} in {vol.availability_zone or 'Unknown'} - "
+        f"${vol.monthly_cost:.2f}/month - {status}"
+        for vol in unused_volumes[:8]
+    ]
 
-    payload = {"text": "\n".join(message_lines)}
+    footer_lines = [
+        "",
+        "Unused EBS volumes continue to incur storage costs",
+        "Consider creating snapshots before deletion for backup",
+        "Regular cleanup helps control storage expenses"
+    ]
+    if len(unused_volumes) > 8:
+        footer_lines.insert(0, f"... and {len(unused_volumes) - 8} more")
+
+    payload = {"text": "\n".join(chain(header_lines, volume_lines, footer_lines))}
 
     try:
-        response = requests.post(webhook, json=payload, timeout=10)
+        response = _HTTP.post(webhook, data=dumps_json(payload), timeout=10)
         if response.status_code == 200:
             log(f"Alert sent successfully to webhook")
         else:
@@ -321,10 +458,19 @@ def main() -> int:
     """Main function."""
     log("Starting unused EBS volume detection")
 
+    # One session and connection-pool config shared by every region's client.
+    # Clients are built here in the main thread since Session.client() is not
+    # thread-safe, while the clients themselves can be used from the workers.
+    session = boto3.session.Session()
+    boto_config = Config(
+        retries={'mode': 'adaptive', 'max_attempts': 5},
+        max_pool_connections=32,
+        tcp_keepalive=True
+    )
+
     # Configuration
-    regions = get_regions()
+    regions = get_regions(session, boto_config)
     min_unused_hours = int(os.getenv("MIN_UNUSED_HOURS", "24"))
-    exclude_tags = [tag.strip() for tag in os.getenv("EXCLUDE_TAGS", "").split(",") if tag.strip()]
     create_snapshots = os.getenv("CREATE_SNAPSHOTS", "false").lower() == "true"
     auto_delete = os.getenv("AUTO_DELETE", "false").lower() == "true"
     dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
@@ -333,7 +479,7 @@ def main() -> int:
 
     log(f"Scanning regions: {', '.join(regions)}")
     log(f"Minimum unused hours: {min_unused_hours}")
-    log(f"Exclude tags: {exclude_tags if exclude_tags else 'None'}")
+    log(f"Exclude tags: {sorted(EXCLUDE_TAGS) if EXCLUDE_TAGS else 'None'}")
     log(f"Create snapshots: {create_snapshots}")
     log(f"Auto-delete mode: {auto_delete}")
     log(f"Dry run mode: {dry_run}")
@@ -344,35 +490,29 @@ def main() -> int:
 
     all_unused_volumes = []
     total_monthly_cost = 0.0
-    action_summary = {'snapshots_created': 0, 'volumes_deleted': 0}
+    action_summary = {'snapshots_created': 0, 'volumes_deleted': 0, 'deleted_cost': 0.0}
 
     try:
-        for region in regions:
-            # Create EC2 client for this region
-            ec2_client = boto3.client('ec2', region_name=region)
-
-            # Find unused volumes
-            unused_volumes, monthly_cost = analyze_unused_volumes(
-                ec2_client, region, exclude_tags, min_unused_hours
+        ec2_clients = {
+            region: session.client('ec2', region_name=region, config=boto_config)
+            for region in regions
+        }
+
+        # Regions are independent, so scan them concurrently
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_REGION_WORKERS, len(regions)))) as executor:
+            region_results = executor.map(
+                lambda region: process_region(
+                    ec2_clients[region], region, EXCLUDE_TAGS, min_unused_hours, create_snapshots, auto_delete, dry_run
+                ),
+                regions
             )
 
-            all_unused_volumes.extend(unused_volumes)
-            total_monthly_cost += monthly_cost
-
-            # Create snapshots if requested
-            if create_snapshots and unused_volumes:
-                log(f"Creating snapshots for {len(unused_volumes)} volume(s) in {region}...")
-                for volume in unused_volumes:
-                    snapshot_id = create_snapshot_for_volume(ec2_client, volume, dry_run)
-                    if snapshot_id:
-                        action_summary['snapshots_created'] += 1
-
-            # Delete volumes if auto-delete is enabled
-            if auto_delete and unused_volumes:
-                log(f"Auto-deleting {len(unused_volumes)} unused volume(s) in {region}...")
-                for volume in unused_volumes:
-                    if delete_volume(ec2_client, volume, dry_run):
-                        action_summary['volumes_deleted'] += 1
+            for unused_volumes, monthly_cost, region_summary in region_results:
+                all_unused_volumes.extend(unused_volumes)
+                total_monthly_cost += monthly_cost
+                action_summary['snapshots_created'] += region_summary['snapshots_created']
+                action_summary['volumes_deleted'] += region_summary['volumes_deleted']
+                action_summary['deleted_cost'] += region_summary['deleted_cost']
 
         # Summary
         log(f"")
@@ -381,15 +521,14 @@ def main() -> int:
         log(f"Total monthly cost: ${total_monthly_cost:.2f}")
 
         if all_unused_volumes:
-            total_size = sum(vol['Size'] for vol in all_unused_volumes)
-            log(f"Total size: {total_size:,} GB")
-
-            # Volume type breakdown
-            volume_types = {}
+            # Total size and volume type breakdown in a single pass
+            total_size = 0
+            volume_types = Counter()
             for vol in all_unused_volumes:
-                vol_type = vol['VolumeType']
-                volume_types[vol_type] = volume_types.get(vol_type, 0) + 1
+                total_size += vol.size
+                volume_types[vol.volume_type] += 1
 
+            log(f"Total size: {total_size:,} GB")
             log("Volume types:")
             for vol_type, count in volume_types.items():
                 log(f"  {vol_type}: {count} volume(s)")
@@ -398,10 +537,12 @@ def main() -> int:
             log(f"Snapshots created: {action_summary['snapshots_created']}")
 
         if action_summary['volumes_deleted'] > 0:
-            deleted_cost = sum(vol['MonthlyCost'] for vol in all_unused_volumes[:action_summary['volumes_deleted']])
             action = "Would save" if dry_run else "Monthly savings"
             log(f"Volumes deleted: {action_summary['volumes_deleted']}")
-            log(f"{action}: ${deleted_cost:.2f}")
+            log(f"{action}: ${action_summary['deleted_cost']:.2f}")
+
+        # Push the scan and summary out before the (possibly slow) webhook call
+        _OUT.flush()
 
         # Send alerts if threshold is met
         if webhook and total_monthly_cost >= cost_threshold:
@@ -417,6 +558,8 @@ def main() -> int:
     except Exception as exc:
         log(f"Unused EBS volume detection failed: {exc}")
         return 1
+    finally:
+        _OUT.flush()
 
     log("Unused EBS volume detection completed")
 
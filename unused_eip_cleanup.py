@@ -12,8 +12,9 @@ The script can operate in several modes:
 - Auto-release: Automatically release unused EIPs (with safety checks)
 
 Environment variables:
-    REGIONS: Comma-separated list of AWS regions to scan. If not set,
-        defaults to the region specified in AWS_DEFAULT_REGION or us-east-1.
+    REGIONS: Comma-separated list of AWS regions to scan, or "all" for every region
+        enabled for the account. If not set, defaults to the region specified in
+        AWS_DEFAULT_REGION or us-east-1.
     AUTO_RELEASE: If "true", automatically release unused EIPs. Use with caution!
     EXCLUDE_TAGS: Comma-separated list of tag keys. EIPs with these tags are preserved.
     MIN_UNUSED_HOURS: Minimum hours an EIP must be unused before considering for release.
@@ -28,54 +29,147 @@ Usage:
 import os
 import sys
 import json
-from datetime import datetime, timezone, timedelta
-from typing import Dict, List, Optional, Tuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from itertools import chain
+from typing import Dict, FrozenSet, List, Tuple
 import boto3
-from botocore.exceptions import ClientError, NoCredentialsError
+from botocore.config import Config
+from botocore.exceptions import BotoCoreError, ClientError, NoCredentialsError
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # Optional faster JSON encoder; stdlib json is used otherwise
+    orjson = None
+
+
+# Log output stream; writes are buffered and flushed at summary boundaries
+_OUT = sys.stdout
+
+# Tag keys that exempt a resource from cleanup, parsed once at startup
+EXCLUDE_TAGS = frozenset(tag.strip() for tag in os.getenv("EXCLUDE_TAGS", "").split(",") if tag.strip())
+
+# EC2 accepts at most 200 values per filter, so address lookups are batched
+FILTER_VALUES_PER_CALL = 200
+
+# Upper bound on regions scanned concurrently
+MAX_REGION_WORKERS = 32
+
+# Upper bound on concurrent ReleaseAddress calls within a region
+MAX_ACTION_WORKERS = 16
+
+# Keep-alive session for webhook alerts; retries transient gateway/throttling errors
+_HTTP = requests.Session()
+_HTTP.headers.update({'Content-Type': 'application/json'})
+_HTTP_ADAPTER = HTTPAdapter(
+    pool_connections=1,
+    pool_maxsize=1,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=frozenset(['POST'])
+    )
+)
+_HTTP.mount('https://', _HTTP_ADAPTER)
+_HTTP.mount('http://', _HTTP_ADAPTER)
+
+
+@dataclass(slots=True)
+class UnusedEip:
+    """An Elastic IP that is not associated with any resource."""
+    allocation_id: str
+    public_ip: str
+    name: str
+    region: str
+    tags: List[Dict]
+    domain: str
 
 
 def log(msg: str) -> None:
-    """Prints a timestamped message to stdout."""
-    ts = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
-    print(f"[{ts}] {msg}")
+    """Writes a timestamped message to stdout (flushed at summary and exit)."""
+    ts = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    _OUT.write(f"[{ts}] {msg}\n")  # single write keeps lines whole across threads
 
 
-def get_regions() -> List[str]:
+def discover_enabled_regions(session, boto_config) -> List[str]:
+    """
+    Get the regions enabled for the account, skipping opt-in regions that were
+    never turned on (they would only return empty responses).
+    """
+    client = session.client(
+        'ec2', region_name=os.getenv("AWS_DEFAULT_REGION", "us-east-1"), config=boto_config
+    )
+    response = client.describe_regions(
+        Filters=[{'Name': 'opt-in-status', 'Values': ['opt-in-not-required', 'opted-in']}]
+    )
+    return sorted(region['RegionName'] for region in response['Regions'])
+
+
+def get_regions(session, boto_config) -> List[str]:
     """Get list of regions to scan."""
-    regions_env = os.getenv("REGIONS")
+    default = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
+    regions_env = os.getenv("REGIONS", "").strip()
+
+    if regions_env.lower() == "all":
+        try:
+            return discover_enabled_regions(session, boto_config)
+        except (BotoCoreError, ClientError) as e:
+            log(f"Could not discover enabled regions, falling back to {default}: {e}")
+            return [default]
+
     if regions_env:
         return [r.strip() for r in regions_env.split(",") if r.strip()]
-    default = os.getenv("AWS_DEFAULT_REGION", "us-east-1")
     return [default]
 
 
-def should_exclude_eip(eip: Dict, exclude_tags: List[str]) -> bool:
+def should_exclude_eip(eip: Dict, exclude_tags: FrozenSet[str]) -> bool:
     """Check if EIP should be excluded based on tags."""
     if not exclude_tags:
         return False
 
-    eip_tags = eip.get('Tags', [])
-    eip_tag_keys = [tag['Key'] for tag in eip_tags]
-
-    for exclude_tag in exclude_tags:
-        if exclude_tag in eip_tag_keys:
-            return True
-
-    return False
+    return not exclude_tags.isdisjoint(tag['Key'] for tag in eip.get('Tags', ()))
 
 
 def get_eip_name(eip: Dict) -> str:
     """Get a friendly name for the EIP from tags."""
     tags = eip.get('Tags', [])
+    # Exact 'Name' is the AWS convention; only fall back to a case-insensitive scan
+    for tag in tags:
+        if tag['Key'] == 'Name':
+            return tag['Value']
     for tag in tags:
         if tag['Key'].lower() == 'name':
             return tag['Value']
     return eip.get('PublicIp', 'Unknown')
 
 
-def analyze_unused_eips(client, region: str, exclude_tags: List[str],
-                       min_unused_hours: int) -> Tuple[List[Dict], float]:
+def get_in_use_public_ips(client, public_ips: List[str]) -> Dict[str, str]:
+    """
+    Map each of the given public IPs that a network interface currently holds
+    to that interface's ID, using one filtered lookup per batch of addresses.
+    """
+    in_use_ips = {}
+    paginator = client.get_paginator('describe_network_interfaces')
+
+    for start in range(0, len(public_ips), FILTER_VALUES_PER_CALL):
+        batch = public_ips[start:start + FILTER_VALUES_PER_CALL]
+        pages = paginator.paginate(Filters=[{'Name': 'association.public-ip', 'Values': batch}])
+        for page in pages:
+            for interface in page['NetworkInterfaces']:
+                association = interface.get('Association')
+                if association and association.get('PublicIp'):
+                    in_use_ips[association['PublicIp']] = interface['NetworkInterfaceId']
+
+    return in_use_ips
+
+
+def analyze_unused_eips(client, region: str, exclude_tags: FrozenSet[str],
+                       min_unused_hours: int) -> Tuple[List[UnusedEip], float]:
     """
     Find unused EIPs in a region and calculate costs.
     Returns (unused_eips, monthly_cost_savings).
@@ -93,6 +187,21 @@ def analyze_unused_eips(client, region: str, exclude_tags: List[str],
 
         log(f"Found {len(all_eips)} Elastic IP(s) in {region}")
 
+        # The association fields on an address can lag a recent attach, so confirm
+        # apparently free addresses against the network interfaces that hold them
+        candidate_ips = [
+            eip['PublicIp'] for eip in all_eips
+            if 'PublicIp' in eip and not (
+                eip.get('InstanceId') or eip.get('AssociationId') or eip.get('NetworkInterfaceId')
+            )
+        ]
+        in_use_ips = {}
+        if candidate_ips:
+            try:
+                in_use_ips = get_in_use_public_ips(client, candidate_ips)
+            except ClientError as e:
+                log(f"Could not cross-check EIP associations in {region}, using address data only: {e}")
+
         unused_eips = []
 
         for eip in all_eips:
@@ -103,7 +212,7 @@ def analyze_unused_eips(client, region: str, exclude_tags: List[str],
             # Check if EIP is associated with an instance or network interface
             instance_id = eip.get('InstanceId')
             association_id = eip.get('AssociationId')
-            network_interface_id = eip.get('NetworkInterfaceId')
+            network_interface_id = eip.get('NetworkInterfaceId') or in_use_ips.get(public_ip)
 
             is_unused = not (instance_id or association_id or network_interface_id)
 
@@ -116,14 +225,14 @@ def analyze_unused_eips(client, region: str, exclude_tags: List[str],
                 # For now, we can't easily check how long it's been unused without CloudTrail
                 # So we'll assume it meets the min_unused_hours requirement
 
-                unused_eips.append({
-                    'AllocationId': allocation_id,
-                    'PublicIp': public_ip,
-                    'Name': name,
-                    'Region': region,
-                    'Tags': eip.get('Tags', []),
-                    'Domain': eip.get('Domain', 'vpc')
-                })
+                unused_eips.append(UnusedEip(
+                    allocation_id=allocation_id,
+                    public_ip=public_ip,
+                    name=name,
+                    region=region,
+                    tags=eip.get('Tags', []),
+                    domain=eip.get('Domain', 'vpc')
+                ))
 
                 log(f"  {public_ip} ({name}): UNUSED - costing $3.60/month")
             else:
@@ -140,14 +249,14 @@ def analyze_unused_eips(client, region: str, exclude_tags: List[str],
         return [], 0.0
 
 
-def release_eip(client, eip_info: Dict, dry_run: bool) -> bool:
+def release_eip(client, eip_info: UnusedEip, dry_run: bool) -> bool:
     """
     Release an unused EIP.
     Returns True if successful or dry-run.
     """
-    allocation_id = eip_info['AllocationId']
-    public_ip = eip_info['PublicIp']
-    name = eip_info['Name']
+    allocation_id = eip_info.allocation_id
+    public_ip = eip_info.public_ip
+    name = eip_info.name
 
     try:
         if dry_run:
@@ -156,7 +265,7 @@ def release_eip(client, eip_info: Dict, dry_run: bool) -> bool:
 
         log(f"Releasing EIP {public_ip} ({name}) - allocation {allocation_id}")
 
-        if eip_info['Domain'] == 'vpc':
+        if eip_info.domain == 'vpc':
             client.release_address(AllocationId=allocation_id)
         else:
             # Classic EC2 (rare these days)
@@ -175,7 +284,39 @@ def release_eip(client, eip_info: Dict, dry_run: bool) -> bool:
             return False
 
 
-def send_alert(webhook: str, unused_eips: List[Dict], total_monthly_cost: float,
+def process_region(ec2_client, region: str, exclude_tags: FrozenSet[str], min_unused_hours: int,
+                   auto_release: bool, dry_run: bool) -> Tuple[List[UnusedEip], float, int]:
+    """
+    Find unused EIPs in a region and release them if enabled.
+    Returns (unused_eips, monthly_cost, released_count) for the region.
+    """
+    released_count = 0
+
+    # Find unused EIPs in this region
+    unused_eips, monthly_cost = analyze_unused_eips(
+        ec2_client, region, exclude_tags, min_unused_hours
+    )
+
+    # Release EIPs if auto-release is enabled
+    if auto_release and unused_eips:
+        log(f"Auto-releasing {len(unused_eips)} unused EIP(s) in {region}...")
+        # Releases are independent calls, so issue them concurrently
+        with ThreadPoolExecutor(max_workers=min(MAX_ACTION_WORKERS, len(unused_eips))) as executor:
+            released_count = sum(executor.map(
+                lambda eip: release_eip(ec2_client, eip, dry_run), unused_eips
+            ))
+
+    return unused_eips, monthly_cost, released_count
+
+
+def dumps_json(payload: Dict) -> bytes:
+    """Serialize a payload to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload).encode('utf-8')
+
+
+def send_alert(webhook: str, unused_eips: List[UnusedEip], total_monthly_cost: float,
                released_count: int, dry_run: bool) -> None:
     """Send alert about unused EIPs to webhook."""
     if not unused_eips:
@@ -183,40 +324,41 @@ def send_alert(webhook: str, unused_eips: List[Dict], total_monthly_cost: float,
 
     action_text = "DRY RUN - Would release" if dry_run else "Released" if released_count > 0 else "Found"
 
-    message_lines = [
-        f"AWS Unused EIP Report",
-        f"",
+    header_lines = [
+        "AWS Unused EIP Report",
+        "",
         f"Found {len(unused_eips)} unused Elastic IP(s)",
         f"Monthly cost: ${total_monthly_cost:.2f}",
     ]
 
     if released_count > 0:
         savings = released_count * 3.60
-        message_lines.extend([
+        header_lines += [
             f"{action_text} {released_count} EIP(s)",
             f"Monthly savings: ${savings:.2f}"
-        ])
+        ]
 
-    message_lines.append("")
-    message_lines.append("EIP Details:")
+    header_lines += ["", "EIP Details:"]
 
-    for eip in unused_eips[:10]:  # Limit to first 10 to avoid huge messages
-        status = "Released" if released_count > 0 and not dry_run else "Unused"
-        message_lines.append(f"- {eip['PublicIp']} ({eip['Name']}) - {eip['Region']} - ${3.60:.2f}/month - {status}")
+    # Limit to first 10 to avoid huge messages; slice before formatting
+    status = "Released" if released_count > 0 and not dry_run else "Unused"
+    eip_lines = [
+        f"- {eip.public_ip} ({eip.name}) - {eip.region} - ${3.60:.2f}/month - {status}"
+        for eip in unused_eips[:10]
+    ]
 
+    footer_lines = [
+        "",
+        "Each unused EIP costs $3.60/month ($0.005/hour)",
+        "Consider releasing unused EIPs to reduce costs"
+    ]
     if len(unused_eips) > 10:
-        message_lines.append(f"... and {len(unused_eips) - 10} more")
-
-    message_lines.extend([
-        f"",
-        f"Each unused EIP costs $3.60/month ($0.005/hour)",
-        f"Consider releasing unused EIPs to reduce costs"
-    ])
+        footer_lines.insert(0, f"... and {len(unused_eips) - 10} more")
 
-    payload = {"text": "\n".join(message_lines)}
+    payload = {"text": "\n".join(chain(header_lines, eip_lines, footer_lines))}
 
     try:
-        response = requests.post(webhook, json=payload, timeout=10)
+        response = _HTTP.post(webhook, data=dumps_json(payload), timeout=10)
         if response.status_code == 200:
             log(f"Alert sent successfully to webhook")
         else:
@@ -229,10 +371,19 @@ def main() -> int:
     """Main function."""
     log("Starting unused EIP cleanup scan")
 
+    # One session and connection-pool config shared by every region's client.
+    # Clients are built here in the main thread since Session.client() is not
+    # thread-safe, while the clients themselves can be used from the workers.
+    session = boto3.session.Session()
+    boto_config = Config(
+        retries={'mode': 'adaptive', 'max_attempts': 5},
+        max_pool_connections=32,
+        tcp_keepalive=True
+    )
+
     # Configuration
-    regions = get_regions()
+    regions = get_regions(session, boto_config)
     auto_release = os.getenv("AUTO_RELEASE", "false").lower() == "true"
-    exclude_tags = [tag.strip() for tag in os.getenv("EXCLUDE_TAGS", "").split(",") if tag.strip()]
     min_unused_hours = int(os.getenv("MIN_UNUSED_HOURS", "1"))
     dry_run = os.getenv("DRY_RUN", "false").lower() == "true"
     webhook = os.getenv("ALERT_WEBHOOK")
@@ -240,7 +391,7 @@ def main() -> int:
 
     log(f"Scanning regions: {', '.join(regions)}")
     log(f"Auto-release mode: {auto_release}")
-    log(f"Exclude tags: {exclude_tags if exclude_tags else 'None'}")
+    log(f"Exclude tags: {sorted(EXCLUDE_TAGS) if EXCLUDE_TAGS else 'None'}")
     log(f"Dry run mode: {dry_run}")
     log(f"Cost threshold: ${cost_threshold:.2f}")
 
@@ -252,24 +403,24 @@ def main() -> int:
     total_released = 0
 
     try:
-        for region in regions:
-            # Create EC2 client for this region
-            ec2_client = boto3.client('ec2', region_name=region)
-
-            # Find unused EIPs in this region
-            unused_eips, monthly_cost = analyze_unused_eips(
-                ec2_client, region, exclude_tags, min_unused_hours
+        ec2_clients = {
+            region: session.client('ec2', region_name=region, config=boto_config)
+            for region in regions
+        }
+
+        # Regions are independent, so scan them concurrently
+        with ThreadPoolExecutor(max_workers=max(1, min(MAX_REGION_WORKERS, len(regions)))) as executor:
+            region_results = executor.map(
+                lambda region: process_region(
+                    ec2_clients[region], region, EXCLUDE_TAGS, min_unused_hours, auto_release, dry_run
+                ),
+                regions
             )
 
-            all_unused_eips.extend(unused_eips)
-            total_monthly_cost += monthly_cost
-
-            # Release EIPs if auto-release is enabled
-            if auto_release and unused_eips:
-                log(f"Auto-releasing {len(unused_eips)} unused EIP(s) in {region}...")
-                for eip in unused_eips:
-                    if release_eip(ec2_client, eip, dry_run):
-                        total_released += 1
+            for unused_eips, monthly_cost, released_count in region_results:
+                all_unused_eips.extend(unused_eips)
+                total_monthly_cost += monthly_cost
+                total_released += released_count
 
         # Summary
         log(f"")
@@ -283,6 +434,9 @@ def main() -> int:
             log(f"EIPs released: {total_released}")
             log(f"{action}: ${savings:.2f}")
 
+        # Push the scan and summary out before the (possibly slow) webhook call
+        _OUT.flush()
+
         # Send alerts if threshold is met
         if webhook and total_monthly_cost >= cost_threshold:
             send_alert(webhook, all_unused_eips, total_monthly_cost, total_released, dry_run)
@@ -298,6 +452,8 @@ def main() -> int:
     except Exception as exc:
         log(f"Unused EIP cleanup failed: {exc}")
         return 1
+    finally:
+        _OUT.flush()
 
     log("Unused EIP cleanup completed")
 